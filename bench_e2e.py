@@ -0,0 +1,592 @@
+import tkinter as tk
+import argparse
+import collections
+import contextlib
+import ctypes
+import ctypes.util
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# End-to-end latency and throughput harness for mst.py.
+#
+# Launches the real ClickTrainerApp on a virtual X display (Xvfb), injects
+# synthetic left clicks aimed at whatever target is currently on screen and
+# measures click-to-next-target-painted latency, i.e. the whole pipeline:
+# X event -> Tk dispatch -> handle_click -> spawn_circle -> repaint.
+#
+# Usage:
+#   python bench_e2e.py                          # run, label results with the current build
+#   python bench_e2e.py --inject xtest           # inject through the X server instead of Tk
+#   python bench_e2e.py --compare bench_results/*.json   # histograms per build side by side
+
+# --- Constants ---
+BENCH_RESULTS_DIR = "bench_results"
+DEFAULT_RATES = [2, 5, 10, 20, 40, 80, 160] # Offered clicks per second for the open-loop sweep
+DEFAULT_CLICKS_PER_PHASE = 100
+DEFAULT_WARMUP_CLICKS = 5
+HISTOGRAM_BIN_EDGES_MS = [0, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000] # Last bin is open-ended
+HISTOGRAM_BAR_WIDTH = 40
+# A rate is sustainable if the p99 time scheduled clicks spend queued behind earlier ones stays within one interval
+SUSTAINABLE_QUEUE_DELAY_INTERVALS = 1.0
+CLICK_TIMEOUT_S = 2.0 # An injected click that produced no new target after this long is counted as lost
+WATCHDOG_INTERVAL_MS = 100
+# Clicks are tagged by what they trigger: "spawn" (hit -> next circle), "round_end" (last hit -> summary
+# screen, which saves and re-reads the round CSVs) and "round_start" (start button -> first circle)
+CLICK_KINDS = ["spawn", "round_end", "round_start"]
+ROUND_TRANSITION_KINDS = ["round_end", "round_start"]
+
+XVFB_DISPLAY = ":99"
+XVFB_SCREEN = "1280x1024x24"
+XVFB_START_TIMEOUT_S = 10.0
+
+
+# --- Virtual Display ---
+def start_virtual_display(display, screen):
+    """Starts Xvfb on `display` and points DISPLAY at it. Returns the Xvfb process."""
+    xvfb_path = shutil.which("Xvfb")
+    if xvfb_path is None:
+        sys.exit("Xvfb not found. Install it (e.g. apt install xvfb) or pass --no-xvfb to use the current display.")
+
+    display_number = display.lstrip(":")
+    socket_path = f"/tmp/.X11-unix/X{display_number}"
+    lock_path = f"/tmp/.X{display_number}-lock"
+    # Otherwise the socket of a server that is already running would look like ours
+    if os.path.exists(socket_path) or os.path.exists(lock_path):
+        sys.exit(f"Display {display} is already in use, pick a free one with --display.")
+
+    proc = subprocess.Popen([xvfb_path, display, "-screen", "0", screen, "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + XVFB_START_TIMEOUT_S
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None:
+            sys.exit(f"Xvfb exited with code {proc.returncode} (is {display} already in use?)")
+        if time.monotonic() > deadline:
+            proc.terminate()
+            sys.exit(f"Timed out waiting for Xvfb on {display}")
+        time.sleep(0.05)
+    if proc.poll() is not None:
+        sys.exit(f"Xvfb exited with code {proc.returncode} right after starting on {display}")
+
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+# --- Click Injection ---
+class EventGenerateInjector:
+    """Queues <Button-1> on the canvas with event_generate (skips the X server)."""
+    name = "event"
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def aim(self, x, y, radius):
+        # Events go straight to the canvas, so nothing placed on top of it can intercept them
+        return x, y
+
+    def click(self, x, y):
+        self.canvas.event_generate("<Button-1>", x=x, y=y, when="tail")
+
+    def close(self):
+        pass
+
+
+class XTestInjector:
+    """Sends real pointer motion and button events through the X server via libXtst."""
+    name = "xtest"
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        x11_path = ctypes.util.find_library("X11")
+        xtst_path = ctypes.util.find_library("Xtst")
+        if not x11_path or not xtst_path:
+            raise RuntimeError("libX11/libXtst not found, use --inject event instead")
+
+        self.x11 = ctypes.CDLL(x11_path)
+        self.xtst = ctypes.CDLL(xtst_path)
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+
+        self.display = self.x11.XOpenDisplay(None)
+        if not self.display:
+            raise RuntimeError(f"Could not open X display {os.environ.get('DISPLAY')!r} for XTest")
+
+    def aim(self, x, y, radius):
+        """Picks a point of the circle where the canvas is the topmost window, so the labels placed
+        over it don't swallow the press. Falls back to the center if the circle is fully covered."""
+        root_x = self.canvas.winfo_rootx()
+        root_y = self.canvas.winfo_rooty()
+        candidates = [(x, y)]
+        for i in range(8):
+            angle = i * math.pi / 4
+            candidates.append((x + int(radius * 0.6 * math.cos(angle)), y + int(radius * 0.6 * math.sin(angle))))
+        for cx, cy in candidates:
+            if self.canvas.winfo_containing(root_x + cx, root_y + cy) == self.canvas:
+                return cx, cy
+        return x, y
+
+    def click(self, x, y):
+        root_x = self.canvas.winfo_rootx() + x
+        root_y = self.canvas.winfo_rooty() + y
+        self.xtst.XTestFakeMotionEvent(self.display, -1, root_x, root_y, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, 1, True, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, 1, False, 0)
+        self.x11.XFlush(self.display)
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+INJECTORS = {"event": EventGenerateInjector, "xtest": XTestInjector}
+
+
+# --- Statistics ---
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_histogram(latencies_ms):
+    """Counts latencies into HISTOGRAM_BIN_EDGES_MS; the last bin catches everything above the last edge."""
+    counts = [0] * len(HISTOGRAM_BIN_EDGES_MS)
+    for value in latencies_ms:
+        bin_index = len(HISTOGRAM_BIN_EDGES_MS) - 1
+        for i in range(len(HISTOGRAM_BIN_EDGES_MS) - 1):
+            if value < HISTOGRAM_BIN_EDGES_MS[i + 1]:
+                bin_index = i
+                break
+        counts[bin_index] += 1
+    return counts
+
+
+def latency_stats(latencies_ms):
+    ordered = sorted(latencies_ms)
+    return {
+        "samples": len(latencies_ms),
+        "mean_ms": sum(ordered) / len(ordered) if ordered else None,
+        "p50_ms": percentile(ordered, 50),
+        "p90_ms": percentile(ordered, 90),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else None,
+        "histogram_counts": build_histogram(ordered),
+        "latencies_ms": latencies_ms,
+    }
+
+
+def summarize_phase(name, offered_rate, latencies_by_kind, queue_delays_ms, elapsed_s, misses, lost):
+    """Top-level latency stats cover hit -> next circle only; round transitions are reported separately.
+
+    In open-loop phases latencies are timed from each click's scheduled time, so `queue_delays_ms`
+    (scheduled -> actually injected) is already included in them.
+    """
+    measured = sum(len(values) for values in latencies_by_kind.values())
+    achieved_rate = measured / elapsed_s if elapsed_s > 0 else 0.0
+    ordered_delays = sorted(queue_delays_ms)
+    queue_p99 = percentile(ordered_delays, 99)
+    sustainable = False
+    if offered_rate is not None and misses == 0 and lost == 0 and queue_p99 is not None:
+        sustainable = queue_p99 <= SUSTAINABLE_QUEUE_DELAY_INTERVALS * 1000.0 / offered_rate
+    phase = {
+        "phase": name,
+        "offered_cps": offered_rate, # None for the closed-loop saturation phase
+        "achieved_cps": achieved_rate,
+        "measured_clicks": measured,
+        "queue_p99_ms": queue_p99,
+        "queue_max_ms": ordered_delays[-1] if ordered_delays else None,
+        "misses": misses,
+        "lost": lost,
+        "sustainable": sustainable,
+    }
+    phase.update(latency_stats(latencies_by_kind["spawn"]))
+    phase["round_transitions"] = {kind: latency_stats(latencies_by_kind[kind]) for kind in ROUND_TRANSITION_KINDS}
+    return phase
+
+
+# --- Harness ---
+class E2EHarness:
+    """Drives a live ClickTrainerApp and times each click until the next target is on screen."""
+
+    def __init__(self, mst, root, app, injector, scratch_dir):
+        self.mst = mst
+        self.root = root
+        self.app = app
+        self.injector = injector
+        self.scratch_dir = scratch_dir
+
+        # (start_time, inject_time, target_id_at_injection, was_paused) while waiting for the repaint.
+        # start_time is the scheduled time in open-loop phases and the injection time in closed-loop ones.
+        self.pending_click = None
+        self.mode = None # "closed" or "open"
+        self.interval_s = 0.0
+        self.clicks_remaining = 0
+        self.warmup_remaining = 0
+        self.clicks_to_schedule = 0
+        self.next_deadline = 0.0
+        self.queued_deadlines = collections.deque() # Scheduled clicks waiting for the previous one to be painted
+        self.measure_start = None # Set once the warmup clicks are done
+        self.tick_after_id = None
+        self.watchdog_after_id = None
+        self.latencies_by_kind = {kind: [] for kind in CLICK_KINDS}
+        self.queue_delays_ms = []
+        self.misses = 0
+        self.lost = 0
+
+        # Appended after the app's own handle_click binding, so it fires once the click has been handled
+        app.canvas.bind("<Button-1>", self.on_click_dispatched, add="+")
+
+    def current_target(self):
+        """Returns (canvas_id, x, y, radius) of whatever the player should click next, or None."""
+        if self.mst.game_paused_for_summary:
+            data = self.mst.summary_circle_data
+        elif self.mst.circles:
+            data = self.mst.circles[0]
+        else:
+            return None
+        if not data:
+            return None
+        return data["id"], data["x"], data["y"], data["radius"]
+
+    def start_measuring(self):
+        self.measure_start = time.perf_counter()
+
+    def count_click(self):
+        """Charges a finished click to the warmup budget first. Returns True if the click is measured."""
+        if self.warmup_remaining > 0:
+            self.warmup_remaining -= 1
+            if self.warmup_remaining == 0:
+                self.start_measuring()
+            return False
+        self.clicks_remaining -= 1
+        return True
+
+    def continue_or_quit(self):
+        if self.clicks_remaining <= 0:
+            self.root.quit()
+        elif self.mode == "closed":
+            self.root.after(0, self.inject_click)
+        elif self.queued_deadlines:
+            self.root.after(0, self.inject_queued_click)
+
+    def inject_queued_click(self):
+        if self.pending_click is not None or not self.queued_deadlines:
+            return
+        self.inject_click(self.queued_deadlines.popleft())
+
+    def inject_click(self, scheduled_time=None):
+        target = self.current_target()
+        if target is None:
+            if self.count_click():
+                self.lost += 1
+            self.continue_or_quit()
+            return
+        target_id, x, y, radius = target
+        x, y = self.injector.aim(x, y, radius)
+        inject_time = time.perf_counter()
+        start_time = inject_time if scheduled_time is None else scheduled_time
+        self.pending_click = (start_time, inject_time, target_id, self.mst.game_paused_for_summary)
+        self.injector.click(x, y)
+
+    def on_click_dispatched(self, event):
+        if self.pending_click is None:
+            return
+        # The canvas schedules its redraw as an idle handler while handle_click runs. Idle handlers
+        # run in FIFO order, so this one only fires after the new target has been drawn.
+        self.root.after_idle(self.on_repainted)
+
+    def on_repainted(self):
+        if self.pending_click is None:
+            return
+        # Round trip to the X server so the drawing requests have actually been executed
+        self.root.winfo_pointerxy()
+        painted_time = time.perf_counter()
+
+        start_time, inject_time, previous_target_id, was_paused = self.pending_click
+        self.pending_click = None
+        target = self.current_target()
+        if target is None or target[0] == previous_target_id:
+            if self.count_click():
+                self.misses += 1
+        elif self.count_click():
+            if was_paused:
+                kind = "round_start"
+            elif self.mst.game_paused_for_summary:
+                kind = "round_end"
+            else:
+                kind = "spawn"
+            self.latencies_by_kind[kind].append((painted_time - start_time) * 1000.0)
+            self.queue_delays_ms.append((inject_time - start_time) * 1000.0)
+
+        self.continue_or_quit()
+
+    def on_open_loop_tick(self):
+        """Schedules the next click. Clicks that come due while another is in flight wait in a queue
+        and keep their scheduled time, so time spent waiting counts towards their latency."""
+        if self.clicks_to_schedule <= 0 or self.clicks_remaining <= 0:
+            return
+        self.clicks_to_schedule -= 1
+        self.queued_deadlines.append(self.next_deadline)
+        self.inject_queued_click()
+
+        self.next_deadline += self.interval_s
+        delay_ms = max(0, int(round((self.next_deadline - time.perf_counter()) * 1000)))
+        self.tick_after_id = self.root.after(delay_ms, self.on_open_loop_tick)
+
+    def on_watchdog(self):
+        if self.clicks_remaining <= 0:
+            return
+        if self.pending_click is not None and time.perf_counter() - self.pending_click[1] > CLICK_TIMEOUT_S:
+            self.pending_click = None
+            if self.count_click():
+                self.lost += 1
+            self.continue_or_quit()
+            if self.clicks_remaining <= 0:
+                return
+        self.watchdog_after_id = self.root.after(WATCHDOG_INTERVAL_MS, self.on_watchdog)
+
+    def run_phase(self, name, clicks, warmup, rate=None):
+        """Closed loop (rate=None) clicks as soon as the next target is painted; open loop clicks at `rate` per second."""
+        # Round ends re-read every CSV in RESULTS_DIR, so each phase starts from an empty one
+        self.mst.RESULTS_DIR = tempfile.mkdtemp(prefix="phase_", dir=self.scratch_dir)
+        self.app.reset_game()
+        self.root.update()
+
+        self.mode = "closed" if rate is None else "open"
+        self.interval_s = 1.0 / rate if rate else 0.0
+        self.clicks_remaining = clicks
+        self.warmup_remaining = warmup
+        self.clicks_to_schedule = clicks + warmup
+        self.queued_deadlines.clear()
+        self.pending_click = None
+        self.latencies_by_kind = {kind: [] for kind in CLICK_KINDS}
+        self.queue_delays_ms = []
+        self.misses = 0
+        self.lost = 0
+        self.measure_start = None
+        if warmup == 0:
+            self.start_measuring()
+
+        self.next_deadline = time.perf_counter()
+        if self.mode == "closed":
+            self.root.after(0, self.inject_click)
+        else:
+            self.tick_after_id = self.root.after(0, self.on_open_loop_tick)
+        self.watchdog_after_id = self.root.after(WATCHDOG_INTERVAL_MS, self.on_watchdog)
+        self.root.mainloop()
+        # Throughput only covers the measured clicks, not the warmup
+        elapsed = time.perf_counter() - self.measure_start if self.measure_start is not None else 0.0
+
+        # Don't let this phase's timers fire inside the next phase's mainloop
+        for after_id in (self.tick_after_id, self.watchdog_after_id):
+            if after_id:
+                self.root.after_cancel(after_id)
+        self.tick_after_id = None
+        self.watchdog_after_id = None
+
+        return summarize_phase(name, rate, self.latencies_by_kind, self.queue_delays_ms, elapsed, self.misses, self.lost)
+
+
+def max_sustainable_rate(phases):
+    """Highest offered rate of the ascending sweep that passed before the first one that didn't."""
+    best = None
+    for phase in sorted((p for p in phases if p["offered_cps"] is not None), key=lambda p: p["offered_cps"]):
+        if not phase["sustainable"]:
+            break
+        best = phase["offered_cps"]
+    return best
+
+
+# --- Reporting ---
+def default_build_label(version):
+    """VERSION from mst.py plus the short git hash (with a -dirty suffix) when available."""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return version
+    return f"{version}-{sha}{'-dirty' if dirty else ''}"
+
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_histogram(title, counts):
+    print(title)
+    peak = max(counts) if counts and max(counts) > 0 else 1
+    for i, count in enumerate(counts):
+        low = HISTOGRAM_BIN_EDGES_MS[i]
+        if i + 1 < len(HISTOGRAM_BIN_EDGES_MS):
+            label = f"{low:>5}-{HISTOGRAM_BIN_EDGES_MS[i + 1]:<5}ms"
+        else:
+            label = f"{low:>5}+     ms"
+        bar = "#" * int(round(count / peak * HISTOGRAM_BAR_WIDTH))
+        print(f"  {label} | {count:>5} {bar}")
+
+
+def print_phase_table(phases):
+    print(f"  {'phase':<12} {'offered':>8} {'achieved':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'queue99':>8} {'miss':>5} {'lost':>5}  ok")
+    for phase in phases:
+        offered = "max" if phase["offered_cps"] is None else f"{phase['offered_cps']:g}"
+        ok = "-" if phase["offered_cps"] is None else ("yes" if phase["sustainable"] else "no")
+        print(f"  {phase['phase']:<12} {offered:>8} {phase['achieved_cps']:>9.1f} "
+              f"{format_ms(phase['p50_ms']):>8} {format_ms(phase['p90_ms']):>8} "
+              f"{format_ms(phase['p99_ms']):>8} {format_ms(phase['max_ms']):>8} "
+              f"{format_ms(phase.get('queue_p99_ms')):>8} {phase['misses']:>5} {phase['lost']:>5}  {ok}")
+
+
+def print_round_transition_table(phases):
+    print("  Round transitions (not included in the percentiles above):")
+    print(f"  {'phase':<12} {'kind':<12} {'samples':>8} {'p50':>8} {'p99':>8} {'max':>8}")
+    for phase in phases:
+        for kind, stats in phase.get("round_transitions", {}).items():
+            print(f"  {phase['phase']:<12} {kind:<12} {stats['samples']:>8} {format_ms(stats['p50_ms']):>8} "
+                  f"{format_ms(stats['p99_ms']):>8} {format_ms(stats['max_ms']):>8}")
+
+
+def print_report(report):
+    print(f"\n=== Build {report['build']} ({report['inject']} injection, {report['screen']}) ===")
+    print_phase_table(report["phases"])
+    print(f"  Max sustainable clicks/s (open loop): {report['max_sustainable_cps'] or 'none'}")
+    print(f"  Saturation throughput (closed loop): {report['saturation_cps']:.1f} clicks/s")
+    print_round_transition_table(report["phases"])
+    print_histogram("  Hit-to-next-circle-painted latency (closed loop, round transitions excluded):",
+                    report["phases"][0]["histogram_counts"])
+
+
+def compare_reports(paths):
+    reports = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error loading {path}: {e}")
+    if not reports:
+        sys.exit("No benchmark reports to compare.")
+
+    reports.sort(key=lambda r: r["timestamp"])
+    for report in reports:
+        print_report(report)
+
+    print("\n=== Summary ===")
+    print(f"  {'build':<24} {'p50':>8} {'p99':>8} {'sat cps':>8} {'max sust':>9}")
+    for report in reports:
+        saturation = report["phases"][0]
+        print(f"  {report['build']:<24} {format_ms(saturation['p50_ms']):>8} {format_ms(saturation['p99_ms']):>8} "
+              f"{report['saturation_cps']:>8.1f} {str(report['max_sustainable_cps'] or 'none'):>9}")
+
+
+# --- Main ---
+def run_benchmark(args):
+    import mst # Imported here so --compare works without the game's dependencies installed
+
+    if not args.sound:
+        mst.SOUND_ENABLED = False
+    # Round data CSVs go to a throwaway directory instead of the player's results folder
+    scratch_dir = tempfile.mkdtemp(prefix="mst_bench_")
+    mst.RESULTS_DIR = scratch_dir
+
+    app_output = None if args.show_app_output else open(os.devnull, "w")
+    injector = None
+    root = tk.Tk()
+    try:
+        with contextlib.redirect_stdout(app_output) if app_output else contextlib.nullcontext():
+            app = mst.ClickTrainerApp(root)
+        root.update()
+        app.canvas.wait_visibility()
+        injector = INJECTORS[args.inject](app.canvas)
+        harness = E2EHarness(mst, root, app, injector, scratch_dir)
+
+        phases = []
+        plan = [("saturation", None)] + [(f"{rate:g}/s", rate) for rate in args.rates]
+        for name, rate in plan:
+            print(f"Running phase {name} ({args.clicks} clicks)...")
+            with contextlib.redirect_stdout(app_output) if app_output else contextlib.nullcontext():
+                phases.append(harness.run_phase(name, args.clicks, args.warmup, rate))
+    finally:
+        if injector:
+            injector.close()
+        root.destroy()
+        if app_output:
+            app_output.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    report = {
+        "build": args.build or default_build_label(mst.VERSION),
+        "timestamp": datetime.now().isoformat(),
+        "inject": args.inject,
+        "display": os.environ.get("DISPLAY"),
+        "screen": f"{mst.WINDOW_WIDTH}x{mst.WINDOW_HEIGHT}",
+        "histogram_bin_edges_ms": HISTOGRAM_BIN_EDGES_MS,
+        "max_sustainable_cps": max_sustainable_rate(phases),
+        "saturation_cps": phases[0]["achieved_cps"],
+        "phases": phases,
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    filename = f"e2e_{report['build']}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    filepath = os.path.join(args.output_dir, filename)
+    with open(filepath, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nResults saved to {filepath}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end click latency/throughput harness for the Mouse Clicker Trainer.")
+    parser.add_argument("--rates", type=float, nargs="+", default=DEFAULT_RATES,
+                        help="Offered click rates (clicks/s) for the open-loop sweep")
+    parser.add_argument("--clicks", type=int, default=DEFAULT_CLICKS_PER_PHASE, help="Measured clicks per phase")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_CLICKS, help="Unmeasured clicks at the start of each phase")
+    parser.add_argument("--inject", choices=sorted(INJECTORS), default="event",
+                        help="event: Tk event_generate, xtest: real X input events via libXtst")
+    parser.add_argument("--build", help="Label for this build (default: VERSION plus git hash)")
+    parser.add_argument("--output-dir", default=BENCH_RESULTS_DIR, help="Where to write the JSON report")
+    parser.add_argument("--no-xvfb", action="store_true", help="Use the current DISPLAY instead of starting Xvfb")
+    parser.add_argument("--display", default=XVFB_DISPLAY, help="Display number for Xvfb")
+    parser.add_argument("--screen", default=XVFB_SCREEN, help="Xvfb screen geometry WxHxDEPTH")
+    parser.add_argument("--sound", action="store_true", help="Keep hit/miss sounds enabled during the run")
+    parser.add_argument("--show-app-output", action="store_true", help="Don't silence the game's console output")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT",
+                        help="Print histograms of saved reports per build instead of running")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare_reports(args.compare)
+        return
+    if args.clicks <= 0 or args.warmup < 0 or any(rate <= 0 for rate in args.rates):
+        sys.exit("--clicks and --rates must be positive and --warmup non-negative.")
+
+    xvfb_proc = None if args.no_xvfb else start_virtual_display(args.display, args.screen)
+    try:
+        run_benchmark(args)
+    finally:
+        if xvfb_proc:
+            xvfb_proc.terminate()
+            xvfb_proc.wait()
+
+
+if __name__ == "__main__":
+    main()
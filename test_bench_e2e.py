@@ -0,0 +1,239 @@
+import heapq
+import itertools
+import tempfile
+import time
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+import bench_e2e
+
+
+# --- Fakes ---
+class FakeRoot:
+    """Minimal stand-in for tk.Tk: timers, idle callbacks and mainloop/quit, driven by real time."""
+
+    def __init__(self):
+        self.timers = []
+        self.idle = []
+        self.counter = itertools.count()
+        self.stopped = False
+
+    def after(self, ms, callback):
+        after_id = next(self.counter)
+        heapq.heappush(self.timers, (time.perf_counter() + ms / 1000.0, after_id, callback))
+        return after_id
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def after_cancel(self, after_id):
+        self.timers = [timer for timer in self.timers if timer[1] != after_id]
+        heapq.heapify(self.timers)
+
+    def quit(self):
+        self.stopped = True
+
+    def update(self):
+        pass
+
+    def winfo_pointerxy(self):
+        return 0, 0
+
+    def mainloop(self):
+        self.stopped = False
+        deadline = time.perf_counter() + 10
+        while not self.stopped:
+            assert time.perf_counter() < deadline, "harness never quit the mainloop"
+            if self.idle:
+                self.idle.pop(0)()
+                continue
+            due, _, callback = heapq.heappop(self.timers)
+            if due > time.perf_counter():
+                time.sleep(due - time.perf_counter())
+            callback()
+
+
+class FakeCanvas:
+    def bind(self, sequence, callback, add=None):
+        self.harness_callback = callback
+
+
+class FakeGame:
+    """Plays the part of mst + ClickTrainerApp: rounds of `circles_per_round` hits, then a summary."""
+
+    def __init__(self, root, circles_per_round=10, handling_s=0.0):
+        self.root = root
+        self.circles_per_round = circles_per_round
+        self.handling_s = handling_s
+        self.ids = itertools.count(1)
+        self.hits = 0
+        self.ignore_clicks = 0 # Next N clicks leave the target unchanged (a miss)
+        self.canvas = FakeCanvas()
+        self.mst = types.SimpleNamespace(game_paused_for_summary=True, circles=[], summary_circle_data=None,
+                                         RESULTS_DIR=None)
+        self.reset_game()
+
+    def new_target(self):
+        return {"id": next(self.ids), "x": 100, "y": 100, "radius": 30}
+
+    def reset_game(self):
+        self.mst.game_paused_for_summary = True
+        self.mst.circles = []
+        self.mst.summary_circle_data = self.new_target()
+
+    def handle_click(self):
+        time.sleep(self.handling_s)
+        if self.ignore_clicks:
+            self.ignore_clicks -= 1
+        elif self.mst.game_paused_for_summary:
+            self.mst.game_paused_for_summary = False
+            self.mst.circles = [self.new_target()]
+            self.hits = 0
+        else:
+            self.hits += 1
+            if self.hits >= self.circles_per_round:
+                self.mst.circles = []
+                self.mst.game_paused_for_summary = True
+                self.mst.summary_circle_data = self.new_target()
+            else:
+                self.mst.circles = [self.new_target()]
+        self.canvas.harness_callback(None)
+
+    # Injector interface
+    def aim(self, x, y, radius):
+        return x, y
+
+    def click(self, x, y):
+        self.root.after(0, self.handle_click)
+
+
+def make_harness(**game_kwargs):
+    root = FakeRoot()
+    game = FakeGame(root, **game_kwargs)
+    harness = bench_e2e.E2EHarness(game.mst, root, game, game, tempfile.mkdtemp())
+    return harness, game
+
+
+# --- Statistics ---
+def test_percentile_is_nearest_rank():
+    assert bench_e2e.percentile([1, 2, 3, 4, 5], 50) == 3
+    assert bench_e2e.percentile(list(range(1, 10)), 50) == 5
+    assert bench_e2e.percentile(list(range(1, 82)), 99) == 81
+    assert bench_e2e.percentile([7], 1) == 7
+    assert bench_e2e.percentile([], 50) is None
+
+
+def test_build_histogram_bins_and_overflow():
+    counts = bench_e2e.build_histogram([0.5, 1, 1.5, 3, 999, 1000, 5000])
+    assert counts[0] == 1 # [0, 1)
+    assert counts[1] == 2 # [1, 2)
+    assert counts[2] == 1 # [2, 4)
+    assert counts[-2] == 1 # [500, 1000)
+    assert counts[-1] == 2 # 1000+
+    assert sum(counts) == 7
+
+
+def test_summarize_phase_separates_round_transitions():
+    latencies = {"spawn": [1.0, 2.0, 3.0], "round_end": [300.0], "round_start": [5.0]}
+    phase = bench_e2e.summarize_phase("10/s", 10, latencies, [0.0] * 5, 0.5, 0, 0)
+    assert phase["measured_clicks"] == 5
+    assert phase["achieved_cps"] == pytest.approx(10.0)
+    assert phase["max_ms"] == 3.0
+    assert phase["round_transitions"]["round_end"]["max_ms"] == 300.0
+    assert phase["sustainable"]
+
+
+def test_summarize_phase_sustainable_depends_on_queue_delay_and_losses():
+    latencies = {"spawn": [1.0], "round_end": [], "round_start": []}
+    assert not bench_e2e.summarize_phase("10/s", 10, latencies, [150.0], 1, 0, 0)["sustainable"]
+    assert not bench_e2e.summarize_phase("10/s", 10, latencies, [0.0], 1, 0, 1)["sustainable"]
+    assert not bench_e2e.summarize_phase("saturation", None, latencies, [0.0], 1, 0, 0)["sustainable"]
+
+
+def test_max_sustainable_rate_stops_at_first_failure():
+    phases = [
+        {"offered_cps": None, "sustainable": False},
+        {"offered_cps": 10, "sustainable": True},
+        {"offered_cps": 80, "sustainable": True},
+        {"offered_cps": 20, "sustainable": True},
+        {"offered_cps": 40, "sustainable": False},
+    ]
+    assert bench_e2e.max_sustainable_rate(phases) == 20
+    assert bench_e2e.max_sustainable_rate(phases[:1] + phases[4:]) is None
+
+
+# --- Harness ---
+def test_closed_loop_excludes_warmup_and_tags_round_transitions():
+    harness, game = make_harness(circles_per_round=3)
+    phase = harness.run_phase("saturation", 8, 2)
+    assert phase["measured_clicks"] == 8
+    assert phase["misses"] == 0 and phase["lost"] == 0
+    # Clicks: start, hit, hit, hit(end) | start, hit, hit, hit(end) | start, hit -- first two are warmup
+    assert phase["samples"] == 4
+    assert phase["round_transitions"]["round_end"]["samples"] == 2
+    assert phase["round_transitions"]["round_start"]["samples"] == 2
+
+
+def test_warmup_misses_are_charged_to_warmup():
+    harness, game = make_harness()
+    game.ignore_clicks = 2
+    phase = harness.run_phase("saturation", 5, 2)
+    assert phase["misses"] == 0
+    assert phase["measured_clicks"] == 5
+
+
+def test_missing_target_counts_as_lost_and_quits():
+    harness, game = make_harness()
+    game.reset_game = lambda: None
+    game.mst.summary_circle_data = None
+    phase = harness.run_phase("saturation", 3, 1)
+    assert phase["lost"] == 3
+    assert phase["measured_clicks"] == 0
+
+
+def test_open_loop_keeps_up_when_handling_is_fast():
+    harness, game = make_harness()
+    phase = harness.run_phase("20/s", 10, 2, rate=20)
+    assert phase["sustainable"]
+    assert phase["achieved_cps"] == pytest.approx(20, rel=0.2)
+
+
+def test_open_loop_counts_queueing_delay_when_overloaded():
+    harness, game = make_harness(handling_s=0.02)
+    closed = harness.run_phase("saturation", 10, 0)
+    overloaded = harness.run_phase("100/s", 20, 0, rate=100)
+    assert not overloaded["sustainable"]
+    assert overloaded["queue_p99_ms"] > 10
+    assert overloaded["p50_ms"] > 2 * closed["p50_ms"]
+
+
+# --- Injection / display ---
+class CoveredCanvas:
+    """Canvas at the screen origin with a label covering everything above y=110."""
+
+    def winfo_rootx(self):
+        return 0
+
+    def winfo_rooty(self):
+        return 0
+
+    def winfo_containing(self, x, y):
+        return self if y >= 110 else "label"
+
+
+def test_xtest_aims_at_an_uncovered_point_of_the_circle():
+    injector = object.__new__(bench_e2e.XTestInjector) # Skip loading libX11/libXtst
+    injector.canvas = CoveredCanvas()
+    x, y = injector.aim(100, 100, 30)
+    assert y >= 110
+    assert (x - 100) ** 2 + (y - 100) ** 2 <= 30 ** 2
+
+
+def test_virtual_display_refuses_a_display_in_use(monkeypatch):
+    monkeypatch.setattr(bench_e2e.shutil, "which", lambda name: "/usr/bin/Xvfb")
+    monkeypatch.setattr(bench_e2e.os.path, "exists", lambda path: path == "/tmp/.X99-lock")
+    monkeypatch.setattr(bench_e2e.subprocess, "Popen", lambda *a, **k: pytest.fail("Xvfb should not be started"))
+    with pytest.raises(SystemExit):
+        bench_e2e.start_virtual_display(":99", "640x480x24")